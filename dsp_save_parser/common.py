@@ -1,35 +1,151 @@
 from typing import *
 from typing import BinaryIO
-from struct import unpack, pack
+from struct import Struct, error as StructError
 from abc import ABCMeta
-from io import BytesIO
+from array import array
+from operator import attrgetter
+import sys
 
 __all__ = ['ParserBase', 'int8', 'int16', 'int32', 'int64', 'uint8', 'uint16', 'uint32', 'uint64', 'float32', 'float64',
-           'string', 'boolean', 'int24', 'FlexibleInt', 'SaveObject']
+           'string', 'boolean', 'int24', 'FlexibleInt', 'SaveObject', 'fields_struct']
 
 _BYTE_ORDER = 'little'  # type: Literal['little', 'big']
 _IO_TYPE = BinaryIO
-_BUILTIN_TYPES = set(__all__) | {'NoneType', 'int', 'float', 'str', 'bool'}
+# types printed by value in repr, matched by identity, the primitive types are added after their definitions
+_BUILTIN_TYPES = {type(None), int, float, str, bool}
 _REPR_SKIP_ENTRIES = {'location_start', 'location_end'}
+# class -> (field names, getter returning the tuple of field values) used by repr, built at SaveObject subclass
+# creation or on first use for other classes
+_REPR_FIELDS_CACHE = {}  # type: Dict[type, Tuple[Tuple[str, ...], Callable[[Any], tuple]]]
 
 assert _BYTE_ORDER in {'little', 'big'}
 
+# pre-compiled struct formats for fixed-width numbers, avoids parsing the format string on every call
+_STRUCT_PREFIX = '<' if _BYTE_ORDER == 'little' else '>'
+_STRUCT_INT8 = Struct(_STRUCT_PREFIX + 'b')
+_STRUCT_UINT8 = Struct(_STRUCT_PREFIX + 'B')
+_STRUCT_INT16 = Struct(_STRUCT_PREFIX + 'h')
+_STRUCT_UINT16 = Struct(_STRUCT_PREFIX + 'H')
+_STRUCT_INT32 = Struct(_STRUCT_PREFIX + 'i')
+_STRUCT_UINT32 = Struct(_STRUCT_PREFIX + 'I')
+_STRUCT_INT64 = Struct(_STRUCT_PREFIX + 'q')
+_STRUCT_UINT64 = Struct(_STRUCT_PREFIX + 'Q')
+_STRUCT_FLOAT32 = Struct(_STRUCT_PREFIX + 'f')
+_STRUCT_FLOAT64 = Struct(_STRUCT_PREFIX + 'd')
+# bound methods of the structs above, saves the attribute lookup on every call
+_UNPACK_INT8, _PACK_INT8 = _STRUCT_INT8.unpack, _STRUCT_INT8.pack
+_UNPACK_UINT8, _PACK_UINT8 = _STRUCT_UINT8.unpack, _STRUCT_UINT8.pack
+_UNPACK_INT16, _PACK_INT16 = _STRUCT_INT16.unpack, _STRUCT_INT16.pack
+_UNPACK_UINT16, _PACK_UINT16 = _STRUCT_UINT16.unpack, _STRUCT_UINT16.pack
+_UNPACK_INT32, _PACK_INT32 = _STRUCT_INT32.unpack, _STRUCT_INT32.pack
+_UNPACK_UINT32, _PACK_UINT32 = _STRUCT_UINT32.unpack, _STRUCT_UINT32.pack
+_UNPACK_INT64, _PACK_INT64 = _STRUCT_INT64.unpack, _STRUCT_INT64.pack
+_UNPACK_UINT64, _PACK_UINT64 = _STRUCT_UINT64.unpack, _STRUCT_UINT64.pack
+_UNPACK_FLOAT32, _PACK_FLOAT32 = _STRUCT_FLOAT32.unpack, _STRUCT_FLOAT32.pack
+_UNPACK_FLOAT64, _PACK_FLOAT64 = _STRUCT_FLOAT64.unpack, _STRUCT_FLOAT64.pack
+# int.from_bytes looked up once, used for the 3-byte integers that have no struct format
+_INT_FROM_BYTES = int.from_bytes
+# pre-built single byte objects, indexed by their value
+_SINGLE_BYTES = [bytes((i,)) for i in range(256)]
+# FlexibleInt payload decoders indexed by the indicator byte, 3-byte payloads have no struct format
+_FLEXIBLE_INT_PAYLOAD_UNPACK = (None, _UNPACK_UINT8, _UNPACK_UINT16, None, _UNPACK_INT32)
+# FlexibleInt indicator byte followed by its payload, packed together on save
+_PACK_FLEXIBLE_UINT16 = Struct(_STRUCT_PREFIX + 'BH').pack
+_PACK_FLEXIBLE_INT32 = Struct(_STRUCT_PREFIX + 'Bi').pack
+# array.array uses native byte order, swap it when it differs from the save data
+_ARRAY_BYTESWAP = sys.byteorder != _BYTE_ORDER
+
+
+def _varint_bytes(value: int) -> bytes:
+    if 0 <= value < 0x80:
+        # most varints are short string lengths
+        return _SINGLE_BYTES[value]
+    # unrolled 2 and 3 bytes encodings, the loop below handles the rest
+    if 0x80 <= value < 0x4000:
+        return bytes((0x80 | value & 0x7F, value >> 7))
+    if 0x4000 <= value < 0x200000:
+        return bytes((0x80 | value & 0x7F, 0x80 | value >> 7 & 0x7F, value >> 14))
+    data_list = []
+    while value > 0x7F:
+        data_list.append(0x80 | value & 0x7F)
+        value >>= 7
+    data_list.append(value)
+    return bytes(data_list)
+
+
+def _varint_size(value: int) -> int:
+    # 7 bits per byte, 0 still takes one byte
+    return (value.bit_length() + 6) // 7 or 1
+
 
 class ParserBase:
+    _ARRAY_TYPECODE = None  # type: Optional[str]
+    """Typecode of array.array for fixed-width types, enables bulk parsing in parse_array."""
+    _SIZE = None  # type: Optional[int]
+    """Serialized size in bytes for fixed-width types, None if the size depends on the value."""
+
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
         raise NotImplementedError()
 
+    @classmethod
+    def parse_array(cls, data: _IO_TYPE, count: int) -> list:
+        if cls._ARRAY_TYPECODE is None:
+            return [cls.parse(data) for _ in range(count)]
+        if count <= 0:
+            return []
+        # read the whole array at once instead of calling parse for each element
+        values = array(cls._ARRAY_TYPECODE)
+        size = count * values.itemsize
+        raw = data.read(size)
+        if len(raw) != size:
+            raise EOFError()
+        values.frombytes(raw)
+        if _ARRAY_BYTESWAP:
+            values.byteswap()
+        return values.tolist()
+
     def save(self, stream: _IO_TYPE):
         raise NotImplementedError()
 
+    @classmethod
+    def save_array(cls, values: Iterable, stream: _IO_TYPE):
+        if cls._ARRAY_TYPECODE is None:
+            for value in values:
+                cls(value).save(stream)
+            return
+        # serialize the whole array at once instead of calling save for each element
+        try:
+            data = array(cls._ARRAY_TYPECODE, values)
+        except TypeError:
+            # values that need a conversion (e.g. 5.0 assigned to an integer list) are saved element-wise like before
+            for value in values:
+                cls(value).save(stream)
+            return
+        if _ARRAY_BYTESWAP:
+            data.byteswap()
+        stream.write(data.tobytes())
+
+    @classmethod
+    def _repr_internal_build_fields(cls):
+        names = tuple(name for name in cls.__slots__ if name not in _REPR_SKIP_ENTRIES)
+        # attrgetter fetches all fields in a single C call, but returns a bare value for a single name
+        if len(names) > 1:
+            getter = attrgetter(*names)
+        elif len(names) == 1:
+            getter = lambda obj, _get=attrgetter(names[0]): (_get(obj),)
+        else:
+            getter = lambda obj: ()
+        fields = _REPR_FIELDS_CACHE[cls] = names, getter
+        return fields
+
     def _repr_internal_get_field_repr(self):
         data = []
-        for name in self.__slots__:
-            if name in _REPR_SKIP_ENTRIES:
-                continue
-            value = getattr(self, name)
-            if value.__class__.__name__ in _BUILTIN_TYPES:
+        fields = _REPR_FIELDS_CACHE.get(self.__class__)
+        if fields is None:
+            fields = self._repr_internal_build_fields()
+        for name, value in zip(fields[0], fields[1](self)):
+            if value.__class__ in _BUILTIN_TYPES:
                 data.append(f'{name}={value!r}')
             elif isinstance(value, list) and len(value) == 0:
                 data.append(f'{name}=[]')  # special cast for empty list
@@ -43,23 +159,23 @@ class ParserBase:
     def get_size(self) -> int:
         return 0
 
-    def _get_size_via_save(self) -> int:
-        ms = BytesIO()
-        self.save(ms)
-        return ms.tell()
-
     def __len__(self):
         return self.get_size()
 
 
+# primitive types: parse returns plain int / float / str values to avoid allocating a subclass instance for
+# every field, the typed wrapper is only constructed when saving (e.g. int32(value).save(stream))
 # noinspection PyPep8Naming
 class int8(int, ParserBase):
+    _ARRAY_TYPECODE = 'b'
+    _SIZE = 1
+
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
-        return cls(int.from_bytes(data.read(1), byteorder=_BYTE_ORDER, signed=True))
+        return _UNPACK_INT8(data.read(1))[0]
 
     def save(self, stream: _IO_TYPE):
-        stream.write(self.to_bytes(1, byteorder=_BYTE_ORDER, signed=True))
+        stream.write(_PACK_INT8(self))
 
     def get_size(self):
         return 1
@@ -67,25 +183,49 @@ class int8(int, ParserBase):
 
 # noinspection PyPep8Naming
 class uint8(int, ParserBase):
+    _ARRAY_TYPECODE = 'B'
+    _SIZE = 1
+
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
-        return cls(int.from_bytes(data.read(1), byteorder=_BYTE_ORDER, signed=False))
+        return _UNPACK_UINT8(data.read(1))[0]
 
     def save(self, stream: _IO_TYPE):
-        stream.write(self.to_bytes(1, byteorder=_BYTE_ORDER, signed=False))
+        stream.write(_PACK_UINT8(self))
 
     def get_size(self):
         return 1
 
 
 # noinspection PyPep8Naming
-class boolean(int8, ParserBase):
+class boolean(int, ParserBase):
+    _SIZE = 1
+
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
-        return cls(bool(int.from_bytes(data.read(1), byteorder=_BYTE_ORDER, signed=False)))
+        return 1 if _UNPACK_UINT8(data.read(1))[0] else 0
+
+    @classmethod
+    def parse_array(cls, data: _IO_TYPE, count: int) -> list:
+        if count <= 0:
+            return []
+        values = data.read(count)
+        if len(values) != count:
+            raise EOFError()
+        return [1 if x else 0 for x in values]
+
+    @classmethod
+    def save_array(cls, values: Iterable, stream: _IO_TYPE):
+        try:
+            data = bytes(values)
+        except TypeError:
+            for value in values:
+                cls(value).save(stream)
+            return
+        stream.write(data)
 
     def save(self, stream: _IO_TYPE):
-        stream.write(self.to_bytes(1, byteorder=_BYTE_ORDER, signed=False))
+        stream.write(_PACK_UINT8(self))
 
     def get_size(self):
         return 1
@@ -93,12 +233,15 @@ class boolean(int8, ParserBase):
 
 # noinspection PyPep8Naming
 class int16(int, ParserBase):
+    _ARRAY_TYPECODE = 'h'
+    _SIZE = 2
+
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
-        return cls(int.from_bytes(data.read(2), byteorder=_BYTE_ORDER, signed=True))
+        return _UNPACK_INT16(data.read(2))[0]
 
     def save(self, stream: _IO_TYPE):
-        stream.write(self.to_bytes(2, byteorder=_BYTE_ORDER, signed=True))
+        stream.write(_PACK_INT16(self))
 
     def get_size(self):
         return 2
@@ -106,12 +249,15 @@ class int16(int, ParserBase):
 
 # noinspection PyPep8Naming
 class uint16(int, ParserBase):
+    _ARRAY_TYPECODE = 'H'
+    _SIZE = 2
+
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
-        return cls(int.from_bytes(data.read(2), byteorder=_BYTE_ORDER, signed=False))
+        return _UNPACK_UINT16(data.read(2))[0]
 
     def save(self, stream: _IO_TYPE):
-        stream.write(self.to_bytes(2, byteorder=_BYTE_ORDER, signed=False))
+        stream.write(_PACK_UINT16(self))
 
     def get_size(self):
         return 2
@@ -119,12 +265,14 @@ class uint16(int, ParserBase):
 
 # noinspection PyPep8Naming
 class int24(int, ParserBase):
+    _SIZE = 3
+
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
-        return cls(int.from_bytes(data.read(3), byteorder=_BYTE_ORDER, signed=True))
+        return _INT_FROM_BYTES(data.read(3), _BYTE_ORDER, signed=True)
 
     def save(self, stream: _IO_TYPE):
-        stream.write(self.to_bytes(3, byteorder=_BYTE_ORDER, signed=True))
+        stream.write(self.to_bytes(3, _BYTE_ORDER, signed=True))
 
     def get_size(self):
         return 3
@@ -132,12 +280,15 @@ class int24(int, ParserBase):
 
 # noinspection PyPep8Naming
 class int32(int, ParserBase):
+    _ARRAY_TYPECODE = 'i'
+    _SIZE = 4
+
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
-        return cls(int.from_bytes(data.read(4), byteorder=_BYTE_ORDER, signed=True))
+        return _UNPACK_INT32(data.read(4))[0]
 
     def save(self, stream: _IO_TYPE):
-        stream.write(self.to_bytes(4, byteorder=_BYTE_ORDER, signed=True))
+        stream.write(_PACK_INT32(self))
 
     def get_size(self):
         return 4
@@ -145,25 +296,31 @@ class int32(int, ParserBase):
 
 # noinspection PyPep8Naming
 class uint32(int, ParserBase):
+    _ARRAY_TYPECODE = 'I'
+    _SIZE = 4
+
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
-        return cls(int.from_bytes(data.read(4), byteorder=_BYTE_ORDER, signed=False))
+        return _UNPACK_UINT32(data.read(4))[0]
 
     def save(self, stream: _IO_TYPE):
-        stream.write(self.to_bytes(4, byteorder=_BYTE_ORDER, signed=False))
+        stream.write(_PACK_UINT32(self))
 
     def get_size(self):
         return 4
 
 
 # noinspection PyPep8Naming
-class int64(int32, ParserBase):
+class int64(int, ParserBase):
+    _ARRAY_TYPECODE = 'q'
+    _SIZE = 8
+
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
-        return cls(int.from_bytes(data.read(8), byteorder=_BYTE_ORDER, signed=True))
+        return _UNPACK_INT64(data.read(8))[0]
 
     def save(self, stream: _IO_TYPE):
-        stream.write(self.to_bytes(8, byteorder=_BYTE_ORDER, signed=True))
+        stream.write(_PACK_INT64(self))
 
     def get_size(self):
         return 8
@@ -171,68 +328,67 @@ class int64(int32, ParserBase):
 
 # noinspection PyPep8Naming
 class uint64(int, ParserBase):
+    _ARRAY_TYPECODE = 'Q'
+    _SIZE = 8
+
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
-        return cls(int.from_bytes(data.read(8), byteorder=_BYTE_ORDER, signed=False))
+        return _UNPACK_UINT64(data.read(8))[0]
 
     def save(self, stream: _IO_TYPE):
-        stream.write(self.to_bytes(8, byteorder=_BYTE_ORDER, signed=False))
+        stream.write(_PACK_UINT64(self))
 
     def get_size(self):
         return 8
 
 
-if _BYTE_ORDER == 'little':
-    # noinspection PyPep8Naming
-    class float32(float, ParserBase):
-        @classmethod
-        def parse(cls, data: _IO_TYPE, props: tuple = ()):
-            return cls(unpack('<f', data.read(4))[0])
+# noinspection PyPep8Naming
+class float32(float, ParserBase):
+    _ARRAY_TYPECODE = 'f'
+    _SIZE = 4
 
-        def save(self, stream: _IO_TYPE):
-            stream.write(pack('<f', self))
+    @classmethod
+    def parse(cls, data: _IO_TYPE, props: tuple = ()):
+        return _UNPACK_FLOAT32(data.read(4))[0]
 
-        def get_size(self):
-            return 4
+    @classmethod
+    def save_array(cls, values: Iterable, stream: _IO_TYPE):
+        # array('f') silently turns out-of-range values into inf, struct raises OverflowError like save does
+        try:
+            data = Struct('%s%df' % (_STRUCT_PREFIX, len(values))).pack(*values)
+        except StructError:
+            for value in values:
+                cls(value).save(stream)
+            return
+        stream.write(data)
 
-else:
-    # noinspection PyPep8Naming
-    class float32(float, ParserBase):
-        @classmethod
-        def parse(cls, data: _IO_TYPE, props: tuple = ()):
-            return cls(unpack('>f', data.read(4))[0])
+    def save(self, stream: _IO_TYPE):
+        stream.write(_PACK_FLOAT32(self))
 
-        def save(self, stream: _IO_TYPE):
-            stream.write(pack('>f', self))
+    def get_size(self):
+        return 4
 
-        def get_size(self):
-            return 4
 
+# noinspection PyPep8Naming
+class float64(float, ParserBase):
+    _ARRAY_TYPECODE = 'd'
+    _SIZE = 8
 
-if _BYTE_ORDER == 'little':
-    # noinspection PyPep8Naming
-    class float64(float32, ParserBase):
-        @classmethod
-        def parse(cls, data: _IO_TYPE, props: tuple = ()):
-            return cls(unpack('<d', data.read(8))[0])
+    @classmethod
+    def parse(cls, data: _IO_TYPE, props: tuple = ()):
+        return _UNPACK_FLOAT64(data.read(8))[0]
 
-        def save(self, stream: _IO_TYPE):
-            stream.write(pack('<d', self))
+    def save(self, stream: _IO_TYPE):
+        stream.write(_PACK_FLOAT64(self))
 
-        def get_size(self):
-            return 8
-else:
-    # noinspection PyPep8Naming
-    class float64(float32, ParserBase):
-        @classmethod
-        def parse(cls, data: _IO_TYPE, props: tuple = ()):
-            return cls(unpack('>d', data.read(8))[0])
+    def get_size(self):
+        return 8
 
-        def save(self, stream: _IO_TYPE):
-            stream.write(pack('>d', self))
 
-        def get_size(self):
-            return 8
+def fields_struct(*types: Type[ParserBase]) -> Struct:
+    """Builds a Struct parsing consecutive fixed-width fields of the given types with a single unpack call, used by
+    the generated parse methods."""
+    return Struct(_STRUCT_PREFIX + ''.join(t._ARRAY_TYPECODE for t in types))
 
 
 # noinspection PyPep8Naming
@@ -240,76 +396,68 @@ class varint(int, ParserBase):
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
         assert _BYTE_ORDER == 'little', 'big endian varint is not implemented'
+        read = data.read
         value = 0
         while True:
-            byte = data.read(1)
+            byte = read(1)
             if not byte:
                 raise EOFError()
-            byte = int.from_bytes(byte, byteorder=_BYTE_ORDER, signed=False)
+            byte = byte[0]
             value = value << 7 | (byte & 0x7F)
-            if byte & 0x80 == 0:
-                break
-        return cls(value)
+            if byte < 0x80:
+                return value
 
     def save(self, stream: _IO_TYPE):
-        data_list = []
-        value = int(self)
-        while value > 0x7F:
-            data_list.append(0x80 | value & 0x7F)
-            value >>= 7
-        data_list.append(value)
-        stream.write(bytes(data_list))
+        stream.write(_varint_bytes(int(self)))
 
     def get_size(self) -> int:
-        return self._get_size_via_save()
+        return _varint_size(self)
 
 # noinspection PyPep8Naming
 class string(str, ParserBase):
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
         length = varint.parse(data)
-        return cls(data.read(length).decode('utf-8'))
+        return data.read(length).decode('utf-8')
 
     def save(self, stream: _IO_TYPE):
         b_str = self.encode('utf-8')
-        varint(len(b_str)).save(stream)
-        stream.write(b_str)
+        stream.write(_varint_bytes(len(b_str)) + b_str)
 
     def get_size(self) -> int:
-        return self._get_size_via_save()
+        # ascii strings encode to one byte per character, skip building the encoded copy
+        length = len(self) if self.isascii() else len(self.encode('utf-8'))
+        return _varint_size(length) + length
 
 
 # IOHelper.WriteFlexibleInt
-class FlexibleInt(int32, ParserBase):
+class FlexibleInt(int, ParserBase):
     @classmethod
     def parse(cls, data: _IO_TYPE, props: tuple = ()):
-        indicator = uint8.parse(data)
+        indicator = _UNPACK_UINT8(data.read(1))[0]
         if indicator > 4 or indicator == 0:
-            return cls(indicator)
-        elif indicator < 4:
-            return cls(int.from_bytes(data.read(indicator), byteorder=_BYTE_ORDER, signed=False))
-        else:
-            return cls(int.from_bytes(data.read(indicator), byteorder=_BYTE_ORDER, signed=True))
+            return indicator
+        elif indicator == 3:
+            return _INT_FROM_BYTES(data.read(3), _BYTE_ORDER, signed=False)
+        return _FLEXIBLE_INT_PAYLOAD_UNPACK[indicator](data.read(indicator))[0]
 
     def save(self, stream: _IO_TYPE):
+        # indicator and payload are written in a single call
         if self == 0:
             stream.write(b'\x00')
         elif self < 0:
-            stream.write(b'\x04')
-            stream.write(self.to_bytes(4, byteorder=_BYTE_ORDER, signed=True))
+            stream.write(_PACK_FLEXIBLE_INT32(4, self))
         elif self <= 0xFF:
             if self <= 4:
-                stream.write(b'\x01')
-            stream.write(self.to_bytes(1, byteorder=_BYTE_ORDER, signed=False))
+                stream.write(b'\x01' + _SINGLE_BYTES[self])
+            else:
+                stream.write(_SINGLE_BYTES[self])
         elif self <= 0xFFFF:
-            stream.write(b'\x02')
-            stream.write(self.to_bytes(2, byteorder=_BYTE_ORDER, signed=False))
+            stream.write(_PACK_FLEXIBLE_UINT16(2, self))
         elif self <= 0xFFFFFF:
-            stream.write(b'\x03')
-            stream.write(self.to_bytes(3, byteorder=_BYTE_ORDER, signed=False))
+            stream.write(b'\x03' + self.to_bytes(3, _BYTE_ORDER, signed=False))
         else:
-            stream.write(b'\x04')
-            stream.write(self.to_bytes(4, byteorder=_BYTE_ORDER, signed=True))
+            stream.write(_PACK_FLEXIBLE_INT32(4, self))
 
     def get_size(self) -> int:
         if self == 0:
@@ -328,6 +476,10 @@ class FlexibleInt(int32, ParserBase):
             return 5
 
 
+_BUILTIN_TYPES.update((ParserBase, int8, int16, int32, int64, uint8, uint16, uint32, uint64, float32, float64, string,
+                       boolean, int24, FlexibleInt))
+
+
 class SaveObject(ParserBase, metaclass=ABCMeta):
     location_start: int
     """The start location of the deserialized object in the file."""
@@ -336,6 +488,12 @@ class SaveObject(ParserBase, metaclass=ABCMeta):
     # _skip_setattr_check: bool
     # """Controlled by generated codes, set to True during __init__ calls to accelerate parsing"""
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # the repr field list only depends on __slots__, build it once when the class is created
+        if hasattr(cls, '__slots__'):
+            cls._repr_internal_build_fields()
+
     def __repr__(self):
         if self.location_start == -1 and self.location_end == -1:
             return super().__repr__()
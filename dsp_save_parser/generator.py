@@ -52,8 +52,7 @@ import re
 import hashlib
 import os
 from datetime import datetime
-from io import StringIO
-from copy import deepcopy
+from functools import lru_cache
 
 
 SPACES = re.compile(r'[ \t]*')
@@ -63,108 +62,146 @@ ARRAY_SIZE = re.compile(r'\s*([^]]+)\s*')
 CONDITION = re.compile(r'if\s*\(\s*([^)]+)\s*\)')
 DEFAULT_CLAUSE = re.compile(r'default\s*\(\s*([^)]+)\s*\)')
 PROPS_BODY = re.compile(r'props\s*\(\s*([^)]+)\s*\)')
+INJECTED = re.compile(r'injected[ \t]+')
+NUMERIC = re.compile(r'-?[0-9]')
+HEX_DIGITS = re.compile(r'[0-9a-fA-F]+')
+DIGITS = re.compile(r'[0-9]+')
 
 BUILTIN_TYPES = {'int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32', 'int64', 'uint64', 'float32', 'float64',
-                 'string', 'boolean', 'FlexibleInt'}
+                 'string', 'boolean', 'FlexibleInt', 'int24'}
+# fixed-width types that can be parsed and saved as a whole array via "parse_array" and "save_array" (List[uint8] is
+# handled as bytes)
+BULK_ARRAY_TYPES = {'int8', 'int16', 'uint16', 'int32', 'uint32', 'int64', 'uint64', 'float32', 'float64',
+                    'boolean'}
+# fixed-width types and their size (the class constant "_SIZE"), no need to wrap the value to compute it
+FIXED_SIZE_TYPES = {'int8': 1, 'uint8': 1, 'int16': 2, 'uint16': 2, 'int24': 3, 'int32': 4, 'uint32': 4, 'int64': 8,
+                    'uint64': 8, 'float32': 4, 'float64': 8, 'boolean': 1}
+# fixed-width types with a struct format (their "_ARRAY_TYPECODE"), consecutive scalar fields of these types are parsed
+# and saved together by a single struct unpack / pack
+STRUCT_FIELD_TYPES = {'int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32', 'int64', 'uint64', 'float32', 'float64'}
+# integer types among them, their values are converted by int() before packing (float() for the others) like the
+# int32(value).save(stream) path
+STRUCT_INT_FIELD_TYPES = STRUCT_FIELD_TYPES - {'float32', 'float64'}
 FLOAT_COMPARISON_EPS = 1e-6
 KEYWORDS_IN_IF_CLAUSE = {'None', 'not', 'and', 'or', 'is'}
+# start of every space separated token in an if clause that is an identifier but not a keyword
+IF_CLAUSE_FIELD = re.compile(r'(?<![^ ])(?!(?:%s)(?: |$))(?=[A-Za-z_])' % '|'.join(sorted(KEYWORDS_IN_IF_CLAUSE)))
+
+
+# patterns used by camel_to_underline
+CAMEL_UPPER_RUN = re.compile(r'([A-Z]+)(?=[A-Z])')
+CAMEL_WORD_START = re.compile(r'([A-Z]*)([A-Z])(?=[a-z0-9_])')
+EQ_NULL = re.compile(r'==\s*null')
+NEQ_NULL = re.compile(r'!=\s*null')
+NOT_OPERATOR = re.compile(r'!(?!=)')
+WHITESPACES = re.compile(r'\s+')
 
 
 # convert camel variable like varName to var_name, VARName to var_name ...
+# the same names and clauses are converted many times while generating, cache the results
+@lru_cache(maxsize=4096)
 def camel_to_underline(name: str):
-    ret = re.sub(r'([A-Z]+)(?=[A-Z])', r'_\1', name)
-    ret = re.sub(r'([A-Z]*)([A-Z])(?=[a-z0-9_])', r'\1_\2', ret).lower()
+    ret = CAMEL_UPPER_RUN.sub(r'_\1', name)
+    ret = CAMEL_WORD_START.sub(r'\1_\2', ret).lower()
     # remove leading "_"
     if ret.startswith('_'):
         ret = ret[1:]
-    # replace the stub "!= null" and "== null" to python "is not None" and "is None"
-    ret = re.sub(r'==\s*null', r' is None', ret)
-    ret = re.sub(r'!=\s*null', r' is not None', ret)
+    # plain identifiers have no operators, skip the substitutions below for them
+    if '=' in ret:
+        # replace the stub "!= null" and "== null" to python "is not None" and "is None"
+        ret = EQ_NULL.sub(r' is None', ret)
+        ret = NEQ_NULL.sub(r' is not None', ret)
     # boolean operators "!" "&&" "||"
-    ret = re.sub(r'!(?!=)', r'not ', ret)
-    ret = re.sub(r'&&', r' and ', ret)
-    ret = re.sub(r'\|\|', r' or ', ret)
+    if '!' in ret:
+        ret = NOT_OPERATOR.sub(r'not ', ret)
+    ret = ret.replace('&&', ' and ')
+    ret = ret.replace('||', ' or ')
     # remove unnecessary spaces
-    ret = re.sub(r'\s+', ' ', ret)
+    ret = WHITESPACES.sub(' ', ret)
     return ret
 
 
-def parse_comment(def_file: TextIO, out_py_file: TextIO, line_no: int = 0):
-    line = def_file.readline().rstrip()
+class Cursor:
+    """Read position over the whole def file text, parsing functions move "pos" instead of seeking a stream."""
+    __slots__ = ['text', 'pos']
+
+    def __init__(self, text: str, pos: int = 0):
+        self.text = text
+        self.pos = pos
+
+    def line_end(self) -> int:
+        # end of the current line including "\n", the same range as readline() returns
+        end = self.text.find('\n', self.pos)
+        return len(self.text) if end == -1 else end + 1
+
+    def peek_line(self) -> str:
+        return self.text[self.pos:self.line_end()]
+
+    def skip_spaces(self) -> int:
+        self.pos = SPACES.match(self.text, self.pos).end()
+        return self.pos
+
+
+def parse_comment(def_file: Cursor, emit: Callable[[str], Any], line_no: int = 0):
+    end = def_file.line_end()
+    line = def_file.text[def_file.pos:end].rstrip()
+    def_file.pos = end
     assert line.startswith('//'), 'line %d: %s' % (line_no, line)
     line = line[2:]
     if SPACE.match(line):
         # only skip the first space
         line = line[1:]
     # write to generated python file
-    out_py_file.write('# (L%d): %s\n' % (line_no, line))
+    emit('# (L%d): %s\n' % (line_no, line))
     return line_no + 1
 
 
-def parse_array_def(def_file: TextIO, var_attrs: Dict[str, Any], line_no: int):
-    rollback_position = def_file.tell()
-    line = def_file.readline()
-    if line.startswith('['):
-        line = line[1:]
-        rollback_position += 1
-        match = ARRAY_SIZE.match(line)
-        assert match, 'line %d: %s' % (line_no, line)
-        array_size = match.group(1)
-        line = line[match.end():]
-        rollback_position += match.end()
-        assert line.startswith(']'), 'line %d: %s' % (line_no, line)
-        rollback_position += 1
+def parse_array_def(def_file: Cursor, var_attrs: Dict[str, Any], line_no: int):
+    text = def_file.text
+    if text.startswith('[', def_file.pos):
+        match = ARRAY_SIZE.match(text, def_file.pos + 1, def_file.line_end())
+        assert match, 'line %d: %s' % (line_no, def_file.peek_line())
+        assert text.startswith(']', match.end()), 'line %d: %s' % (line_no, def_file.peek_line())
+        def_file.pos = match.end() + 1
         var_attrs['is_array'] = True
-        var_attrs['array_size'] = array_size
+        var_attrs['array_size'] = match.group(1)
     else:
         var_attrs['is_array'] = False
-    def_file.seek(rollback_position)
     return line_no
 
 
-def parse_if_clause(def_file: TextIO, var_attrs: Dict[str, Any], line_no: int):
-    rollback_position = def_file.tell()
-    line = def_file.readline()
-    def_file.seek(rollback_position)
-    if line.startswith('if'):
-        match = CONDITION.match(line)
-        assert match, 'line %d: %s' % (line_no, line)
-        condition = match.group(1)
-        rollback_position += match.end()
-        var_attrs['if_clause'] = condition
+def parse_if_clause(def_file: Cursor, var_attrs: Dict[str, Any], line_no: int):
+    if def_file.text.startswith('if', def_file.pos):
+        match = CONDITION.match(def_file.text, def_file.pos, def_file.line_end())
+        assert match, 'line %d: %s' % (line_no, def_file.peek_line())
+        var_attrs['if_clause'] = match.group(1)
+        def_file.pos = match.end()
     else:
         var_attrs['if_clause'] = None
-    def_file.seek(rollback_position)
     return line_no
 
 
-def parse_default_clause(def_file: TextIO, var_attrs: Dict[str, Any], line_no: int):
-    rollback_position = def_file.tell()
-    line = def_file.readline()
-    def_file.seek(rollback_position)
-    if line.startswith('default'):
-        match = DEFAULT_CLAUSE.match(line)
-        assert match, 'line %d: %s' % (line_no, line)
+def parse_default_clause(def_file: Cursor, var_attrs: Dict[str, Any], line_no: int):
+    if def_file.text.startswith('default', def_file.pos):
+        match = DEFAULT_CLAUSE.match(def_file.text, def_file.pos, def_file.line_end())
+        assert match, 'line %d: %s' % (line_no, def_file.peek_line())
         default_value = match.group(1).strip()
         if TOKEN.match(default_value):
             var_attrs['default'] = {'type': 'ref', 'value': default_value}
         else:
-            tmp_rollback_position = rollback_position + match.start(1)
-            def_file.seek(tmp_rollback_position)
+            def_file.pos = match.start(1)
             tmp = {}
             line_no = parse_value(def_file, tmp, line_no)
             var_attrs['default'] = {'type': 'const', 'value': tmp['value']}
-        rollback_position += match.end()
+        def_file.pos = match.end()
     else:
         var_attrs['default'] = None
-    def_file.seek(rollback_position)
     return line_no
 
 
-def parse_value(def_file: TextIO, var_attrs: Dict[str, Any], line_no: int):
-    rollback_position = def_file.tell()
-    line = def_file.readline()
-    def_file.seek(rollback_position)
+def parse_value(def_file: Cursor, var_attrs: Dict[str, Any], line_no: int):
+    rollback_position = def_file.pos
+    line = def_file.peek_line()
     if line.startswith('"'):
         # string value
         line = line[1:]
@@ -174,9 +211,8 @@ def parse_value(def_file: TextIO, var_attrs: Dict[str, Any], line_no: int):
         rollback_position += another_quote_pos + 2
     else:
         # numeric value
-        if not re.search(r'-?[0-9]', line):
+        if not NUMERIC.search(line):
             # skip non-numeric value
-            def_file.seek(rollback_position)
             return line_no
         sign = line.startswith('-')
         if sign:
@@ -185,12 +221,12 @@ def parse_value(def_file: TextIO, var_attrs: Dict[str, Any], line_no: int):
         if line.startswith('0x'):
             line = line[2:]
             rollback_position += 2
-            match = re.search(r'[0-9a-fA-F]+', line)
+            match = HEX_DIGITS.search(line)
             assert match, 'line %d: %s' % (line_no, line)
             var_attrs['value'] = int(match.group(0), 16)
             rollback_position += match.end()
         else:
-            match = re.search(r'[0-9]+', line)
+            match = DIGITS.search(line)
             assert match, 'line %d: %s' % (line_no, line)
             group1 = match.group(0)
             value_type = int
@@ -200,7 +236,7 @@ def parse_value(def_file: TextIO, var_attrs: Dict[str, Any], line_no: int):
                 value_type = float
                 line = line[1:]
                 rollback_position += 1
-                match = re.search(r'[0-9]+', line)
+                match = DIGITS.search(line)
                 if match:
                     group2 = match.group(0)
                     rollback_position += match.end()
@@ -213,26 +249,18 @@ def parse_value(def_file: TextIO, var_attrs: Dict[str, Any], line_no: int):
         if sign:
             var_attrs['value'] = -var_attrs['value']
     var_attrs['type'] = 'const'
-    def_file.seek(rollback_position)
+    def_file.pos = rollback_position
     return line_no
 
 
-def parse_assertion(def_file: TextIO, var_attrs: Dict[str, Any], line_no: int):
-    rollback_position = def_file.tell()
-    line = def_file.readline()
-    def_file.seek(rollback_position)
-    if line.startswith('='):
-        line = line[1:]
-        rollback_position += 1
-        match = SPACES.match(line)
-        rollback_position += match.end()
-        line = line[match.end():]
-        def_file.seek(rollback_position)
-        match = TOKEN.match(line)
+def parse_assertion(def_file: Cursor, var_attrs: Dict[str, Any], line_no: int):
+    if def_file.text.startswith('=', def_file.pos):
+        def_file.pos += 1
+        def_file.skip_spaces()
+        match = TOKEN.match(def_file.text, def_file.pos)
         if match:
             var_attrs['assertion'] = {'type': 'ref', 'value': match.group(0)}
-            rollback_position += match.end()
-            def_file.seek(rollback_position)
+            def_file.pos = match.end()
         else:
             attrs = {}
             line_no = parse_value(def_file, attrs, line_no)
@@ -242,110 +270,77 @@ def parse_assertion(def_file: TextIO, var_attrs: Dict[str, Any], line_no: int):
     return line_no
 
 
-def parse_props_clause(def_file: TextIO, var_attrs: Dict[str, Any], line_no: int):
-    rollback_position = def_file.tell()
-    line = def_file.readline()
-    def_file.seek(rollback_position)
-    if line.startswith('props'):
-        match = PROPS_BODY.match(line)
-        assert match, 'line %d: %s' % (line_no, line)
-        props_body = match.group(1).strip()
-        props_body = props_body.split(',')
-        props_body = [x.strip() for x in props_body]
-        var_attrs['props'] = props_body
-        rollback_position += match.end()
+def parse_props_clause(def_file: Cursor, var_attrs: Dict[str, Any], line_no: int):
+    if def_file.text.startswith('props', def_file.pos):
+        match = PROPS_BODY.match(def_file.text, def_file.pos, def_file.line_end())
+        assert match, 'line %d: %s' % (line_no, def_file.peek_line())
+        # each item is stripped, no need to strip the whole body first
+        var_attrs['props'] = [x.strip() for x in match.group(1).split(',')]
+        def_file.pos = match.end()
     else:
         var_attrs['props'] = None
-    def_file.seek(rollback_position)
     return line_no
 
 
-def parse_variable_def(def_file: TextIO, var_meta: Dict[str, Any], line_no: int):
-    rollback_position = def_file.tell()
-    line = def_file.readline().rstrip()
+# extra clauses after the variable name, dispatched by their first character
+EXTRA_DEFS = {'i': ('if_clause', parse_if_clause), 'd': ('default', parse_default_clause),
+              '=': ('assertion', parse_assertion), 'p': ('props', parse_props_clause)}
 
-    match = TOKEN.match(line)
-    assert match, 'line %d: %s' % (line_no, line)
+
+def parse_variable_def(def_file: Cursor, var_meta: Dict[str, Any], line_no: int):
+    text = def_file.text
+    match = TOKEN.match(text, def_file.pos)
+    assert match, 'line %d: %s' % (line_no, def_file.peek_line())
     var_type = match.group()
-    line = line[match.end():]
-    rollback_position += match.end()
+    def_file.pos = match.end()
     template_data = {}
-    def_file.seek(rollback_position)
     line_no = parse_template_def(def_file, template_data, line_no)
     var_meta['template_type_list'] = template_data['generic_type_def']
-    rollback_position = def_file.tell()
-    line = def_file.readline().rstrip()
-    spaces = SPACES.match(line)
-    assert spaces.end() > 0, 'line %d: %s' % (line_no, line)
-    line = line[spaces.end():]
-    rollback_position += spaces.end()
-
-    match = TOKEN.match(line)
-    assert match, 'line %d: %s' % (line_no, line)
+    name_start = SPACES.match(text, def_file.pos).end()
+    assert name_start > def_file.pos, 'line %d: %s' % (line_no, def_file.peek_line())
+    def_file.pos = name_start
+
+    match = TOKEN.match(text, def_file.pos)
+    assert match, 'line %d: %s' % (line_no, def_file.peek_line())
     var_name = match.group()
-    line = line[match.end():]
-    rollback_position += match.end()
-    spaces = SPACES.match(line)
-    rollback_position += spaces.end()
+    def_file.pos = SPACES.match(text, match.end()).end()
 
     var_meta['type'] = var_type
     var_meta['name'] = var_name
 
-    def_file.seek(rollback_position)
     line_no = parse_array_def(def_file, var_meta, line_no)
 
-    extra_defs = {'if_clause': parse_if_clause, 'default': parse_default_clause, 'assertion': parse_assertion,
-                  'props': parse_props_clause}
     while True:
-        rollback_position = def_file.tell()
-        line = def_file.readline().rstrip('\n')
-        spaces = SPACES.match(line)
-        rollback_position += spaces.end()
-        line = line[spaces.end():]
-        if len(line) == 0:
-            for key in extra_defs:
-                if key not in var_meta:
-                    var_meta[key] = None
+        pos = def_file.skip_spaces()
+        if pos == len(text) or text[pos] not in EXTRA_DEFS:
             break
-
-        def_file.seek(rollback_position)
-        matched = False
-        for key, handling_func in extra_defs.items():
-            if var_meta.get(key, None) is None:
-                line_no = handling_func(def_file, var_meta, line_no)
-                if var_meta.get(key, None) is not None:
-                    matched = True
-                    break
-        if not matched:
-            return line_no
-
-    def_file.seek(rollback_position)
+        key, handling_func = EXTRA_DEFS[text[pos]]
+        if var_meta.get(key, None) is not None:
+            break
+        line_no = handling_func(def_file, var_meta, line_no)
+        if var_meta.get(key, None) is None:
+            break
+    for key, _ in EXTRA_DEFS.values():
+        if key not in var_meta:
+            var_meta[key] = None
     return line_no
 
 
-def parse_attribute_def(def_file: TextIO, class_attrs: Dict[str, Any], line_no: int):
+def parse_attribute_def(def_file: Cursor, class_attrs: Dict[str, Any], line_no: int):
     var_meta = {}  # type: Dict[str, Any]
 
     # 1.0.2: injected keyword
-    rollback_position = def_file.tell()
-    line = def_file.readline().rstrip('\n')
-    if line.startswith('injected'):
+    match = INJECTED.match(def_file.text, def_file.pos)
+    if match:
         var_meta['injected'] = True
-        line = line[8:]
-        rollback_position += 8
-        match = SPACES.match(line)
-        rollback_position += match.end()
+        def_file.pos = match.end()
     else:
         var_meta['injected'] = False
 
-    def_file.seek(rollback_position)
     line_no = parse_variable_def(def_file, var_meta, line_no)
 
-    rollback_position = def_file.tell()
-    line = def_file.readline().rstrip('\n')
-    spaces = SPACES.match(line)
-    rollback_position += spaces.end()
-    line = line[spaces.end():]
+    def_file.skip_spaces()
+    line = def_file.peek_line().rstrip('\n')
 
     # inline comment
     if line.startswith('//'):
@@ -353,28 +348,24 @@ def parse_attribute_def(def_file: TextIO, class_attrs: Dict[str, Any], line_no:
         if SPACE.search(comment):
             comment = comment[1:]
         var_meta['comment'] = comment
-        rollback_position += len(line)
+        def_file.pos += len(line)
     else:
         var_meta['comment'] = None
 
-    def_file.seek(rollback_position)
     class_attrs[var_meta['name']] = var_meta
     return line_no
 
 
-def parse_class_body(def_file: TextIO, class_attrs: Dict[str, Any], line_no: int):
+def parse_class_body(def_file: Cursor, class_attrs: Dict[str, Any], line_no: int):
     tmp_comment_index = 0
     while True:
-        rollback_position = def_file.tell()
-        if def_file.read(1) == '}':
-            def_file.seek(rollback_position)
+        if def_file.text.startswith('}', def_file.pos):
             return line_no
-        def_file.seek(rollback_position)
         line_no = parse_attribute_def(def_file, class_attrs, line_no)
-        tmp_comment = StringIO()
-        line_no = parse_new_line(def_file, tmp_comment, line_no)
-        if tmp_comment.tell() > 0:
-            class_attrs['tmp_comment_%d' % tmp_comment_index] = {'type': 'comment', 'comment': tmp_comment.getvalue()}
+        tmp_comment = []
+        line_no = parse_new_line(def_file, tmp_comment.append, line_no)
+        if len(tmp_comment) > 0:
+            class_attrs['tmp_comment_%d' % tmp_comment_index] = {'type': 'comment', 'comment': ''.join(tmp_comment)}
 
 
 def pretty_write(out_py_file: TextIO, array: List[str], leading_str: str = '', leading_spaces: int = -1,
@@ -413,54 +404,47 @@ def pretty_write(out_py_file: TextIO, array: List[str], leading_str: str = '', l
         out_py_file.write('\n')
 
 
-def parse_template_type_name_list(def_file: TextIO, type_name_defs: List[str], line_no: int):
-    rollback_position = def_file.tell()
-    line = def_file.readline().rstrip('\n')
-    spaces = SPACES.match(line)
-    rollback_position += spaces.end()
-    line = line[spaces.end():]
-    token = TOKEN.match(line)
-    name = token.group()
-    type_name_defs.append(name)
-    rollback_position += len(name)
-    line = line[len(name):]
-    spaces = SPACES.match(line)
-    rollback_position += spaces.end()
-    line = line[spaces.end():]
-    while line.startswith(','):
-        line = line[1:]
-        rollback_position += 1
-        spaces = SPACES.match(line)
-        rollback_position += spaces.end()
-        line = line[spaces.end():]
-        token = TOKEN.match(line)
-        name = token.group()
-        type_name_defs.append(name)
-        rollback_position += len(name)
-    def_file.seek(rollback_position)
+def parse_template_type_name_list(def_file: Cursor, type_name_defs: List[str], line_no: int):
+    def_file.skip_spaces()
+    token = TOKEN.match(def_file.text, def_file.pos)
+    assert token, 'line %d: %s' % (line_no, def_file.peek_line())
+    type_name_defs.append(token.group())
+    def_file.pos = token.end()
+    while def_file.text.startswith(',', def_file.skip_spaces()):
+        def_file.pos += 1
+        def_file.skip_spaces()
+        token = TOKEN.match(def_file.text, def_file.pos)
+        assert token, 'line %d: %s' % (line_no, def_file.peek_line())
+        type_name_defs.append(token.group())
+        def_file.pos = token.end()
     return line_no
 
     
-def parse_template_def(def_file: TextIO, template_data: Dict[str, Any], line_no: int):
-    rollback_position = def_file.tell()
+def parse_template_def(def_file: Cursor, template_data: Dict[str, Any], line_no: int):
     type_name_defs = []
     is_template_cls = False
-    if def_file.read(1) == '<':
+    if def_file.text.startswith('<', def_file.pos):
+        def_file.pos += 1
         parse_template_type_name_list(def_file, type_name_defs, line_no)
-        rollback_position = def_file.tell()
-        line = def_file.readline().rstrip('\n')
-        spaces = SPACES.match(line)
-        rollback_position += spaces.end()
-        line = line[spaces.end():]
-        assert line[0] == '>', 'line %d: %s' % (line_no, line)
-        rollback_position += 1
+        assert def_file.text.startswith('>', def_file.skip_spaces()), 'line %d: %s' % (line_no, def_file.peek_line())
+        def_file.pos += 1
         is_template_cls = True
-    def_file.seek(rollback_position)
     template_data['generic_type_def'] = type_name_defs
     template_data['is_template_cls'] = is_template_cls
     return line_no
 
 
+# copies only the parts of class_def that are modified for a template instance, the rest is shared read-only
+def copy_class_def_for_template(class_def: dict):
+    new_class_def = class_def.copy()
+    new_class_def['template_data'] = {'is_template_cls': False, 'generic_type_def': []}
+    new_class_def['class_attrs'] = {name: meta.copy() for name, meta in class_def['class_attrs'].items()}
+    for meta in new_class_def['class_attrs'].values():
+        if 'template_type_list' in meta:
+            meta['template_type_list'] = list(meta['template_type_list'])
+    return new_class_def
+
+
 def write_template_py_class(class_def: dict, template_type_list: list, out_py_file: TextIO, line_no: int):
     template_class_name = '%s_%s' % (class_def['class_name'], ''.join(template_type_list))
     template_data = class_def['template_data']
@@ -468,10 +452,8 @@ def write_template_py_class(class_def: dict, template_type_list: list, out_py_fi
     assert len(template_data['generic_type_def']) == len(template_type_list), '%s: nonequal template type list' % class_def['class_name']
     if template_class_name in _generated_template_classes:
         return
-    new_class_def = deepcopy(class_def)
+    new_class_def = copy_class_def_for_template(class_def)
     new_class_def['class_name'] = template_class_name
-    new_class_def['template_data']['is_template_cls'] = False
-    new_class_def['template_data']['generic_type_def'] = []
     # replacing template types
     class_attrs = new_class_def['class_attrs']
     template_type_mappings = {t_origin: t_real for t_origin, t_real in zip(template_data['generic_type_def'], template_type_list)}
@@ -492,6 +474,25 @@ def write_template_py_class(class_def: dict, template_type_list: list, out_py_fi
         write_template_py_class(_global_class_defs[type_name], template_type_list, out_py_file, line_no)
 
 
+def write_parse_assertion(meta: Dict[str, Any], out_py_file: TextIO):
+    if meta['assertion'] and not meta['injected']:
+        if meta['assertion']['type'] == 'ref':
+            out_py_file.write('        assert %s == %s' % (meta['generated_name'],
+                                                           camel_to_underline(meta['assertion']['value'])))
+        else:
+            if type(meta['assertion']) == str:
+                out_py_file.write('        assert %s == %s' % (meta['generated_name'],
+                                                               repr(bytes(meta['assertion']['value'], 'utf8'))))
+            elif type(meta['assertion']) == float:
+                out_py_file.write('        assert abs(%s - %s) < %s' % (meta['generated_name'],
+                                                                        repr(meta['assertion']['value']),
+                                                                        repr(FLOAT_COMPARISON_EPS)))
+            else:
+                out_py_file.write('        assert %s == %s' % (meta['generated_name'],
+                                                               repr(meta['assertion']['value'])))
+        out_py_file.write(', str(%s)\n' % meta['generated_name'])
+
+
 def write_py_class(class_def: dict, out_py_file: TextIO, line_no: int):
     template_data = class_def['template_data']
     if template_data['is_template_cls']:
@@ -502,7 +503,7 @@ def write_py_class(class_def: dict, out_py_file: TextIO, line_no: int):
     out_py_file.write('# noinspection DuplicatedCode,PyShadowingBuiltins,PyPep8Naming\n')
     out_py_file.write('class %s(SaveObject):\n' % class_name)
     tmp_comments = class_def['tmp_comments']
-    for line in tmp_comments.getvalue().split('\n'):
+    for line in ''.join(tmp_comments).split('\n'):
         if line.strip() == '':
             continue
         out_py_file.write('    %s\n' % line)
@@ -554,6 +555,12 @@ def write_py_class(class_def: dict, out_py_file: TextIO, line_no: int):
         meta['generated_comment'] = comment
         meta['generated_type'] = py_type
         meta['generated_name'] = name
+        if meta['is_array']:
+            meta['generated_array_size'] = camel_to_underline(meta['array_size'])
+        if meta['if_clause']:
+            meta['generated_if_clause'] = camel_to_underline(meta['if_clause'])
+            # the same condition referring to the instance attributes, used by save and get_size
+            meta['generated_self_if_clause'] = IF_CLAUSE_FIELD.sub('self.', meta['generated_if_clause'])
 
     # add "location_start" and "location_end"
     slot_items.extend(['location_start', 'location_end'])
@@ -562,6 +569,29 @@ def write_py_class(class_def: dict, out_py_file: TextIO, line_no: int):
     out_py_file.write('\n')
     pretty_write(out_py_file, ["'%s'" % x for x in slot_items], leading_str='    __slots__ = [', trailing_str=']')
 
+    # group consecutive fixed-width scalar fields, each group is parsed and saved by one struct class attribute
+    struct_groups = []
+    current_group = []
+    for meta in class_attrs.values():
+        if meta['type'] == 'comment':
+            continue
+        if meta['type'] in STRUCT_FIELD_TYPES and not meta['is_array'] and not meta['if_clause'] and \
+                not meta['injected']:
+            current_group.append(meta)
+            continue
+        if len(current_group) > 1:
+            struct_groups.append(current_group)
+        current_group = []
+    if len(current_group) > 1:
+        struct_groups.append(current_group)
+    struct_group_starts = {}
+    for i, group in enumerate(struct_groups):
+        struct_group_starts[group[0]['generated_name']] = i
+        for meta in group:
+            meta['struct_group'] = i
+        pretty_write(out_py_file, [meta['type'] for meta in group],
+                     leading_str='    _FIELDS_STRUCT_%d = fields_struct(' % i, trailing_str=')')
+
     # generate __init__
     out_py_file.write('\n')
     init_params = ['%s: %s' % (meta['generated_name'], meta['generated_type']) for _, meta in class_attrs.items()
@@ -588,6 +618,18 @@ def write_py_class(class_def: dict, out_py_file: TextIO, line_no: int):
     for meta in class_attrs.values():
         if meta['type'] == 'comment':
             continue
+        if meta['generated_name'] in struct_group_starts:
+            group_index = struct_group_starts[meta['generated_name']]
+            group = struct_groups[group_index]
+            group_size = sum(FIXED_SIZE_TYPES[x['type']] for x in group)
+            unpack_stmt = 'cls._FIELDS_STRUCT_%d.unpack(stream.read(%d))' % (group_index, group_size)
+            pretty_write(out_py_file, [x['generated_name'] for x in group], leading_str='        (',
+                         trailing_str=') = %s' % unpack_stmt)
+            for group_meta in group:
+                write_parse_assertion(group_meta, out_py_file)
+            continue
+        if 'struct_group' in meta:
+            continue
         if meta['props']:
             props = [camel_to_underline(x) for x in meta['props']]
             if len(props) > 1:
@@ -601,12 +643,14 @@ def write_py_class(class_def: dict, out_py_file: TextIO, line_no: int):
         else:
             assign_stmt = '%s.parse(stream%s)' % (meta['type'], props_str)
         if meta['is_array']:
-            assign_stmt = '[%s for i in range(%s)]' % (assign_stmt, camel_to_underline(meta['array_size']))
+            assign_stmt = '[%s for i in range(%s)]' % (assign_stmt, meta['generated_array_size'])
             # special case for List[uint8]
             if meta['generated_type'] == 'bytes':
-                assign_stmt = 'bytes(stream.read(%s))' % camel_to_underline(meta['array_size'])
+                assign_stmt = 'bytes(stream.read(%s))' % meta['generated_array_size']
+            elif meta['type'] in BULK_ARRAY_TYPES and not meta['injected']:
+                assign_stmt = '%s.parse_array(stream, %s)' % (meta['type'], meta['generated_array_size'])
         if meta['if_clause']:
-            out_py_file.write('        if %s:\n' % camel_to_underline(meta['if_clause']))
+            out_py_file.write('        if %s:\n' % meta['generated_if_clause'])
             out_py_file.write('            %s = %s\n' % (meta['generated_name'], assign_stmt))
             out_py_file.write('        else:\n')
             if meta['default']:
@@ -621,22 +665,7 @@ def write_py_class(class_def: dict, out_py_file: TextIO, line_no: int):
                 out_py_file.write('            %s = None\n' % meta['generated_name'])
         else:
             out_py_file.write('        %s = %s\n' % (meta['generated_name'], assign_stmt))
-        if meta['assertion'] and not meta['injected']:
-            if meta['assertion']['type'] == 'ref':
-                out_py_file.write('        assert %s == %s' % (meta['generated_name'],
-                                                               camel_to_underline(meta['assertion']['value'])))
-            else:
-                if type(meta['assertion']) == str:
-                    out_py_file.write('        assert %s == %s' % (meta['generated_name'],
-                                                                   repr(bytes(meta['assertion']['value'], 'utf8'))))
-                elif type(meta['assertion']) == float:
-                    out_py_file.write('        assert abs(%s - %s) < %s' % (meta['generated_name'],
-                                                                            repr(meta['assertion']['value']),
-                                                                            repr(FLOAT_COMPARISON_EPS)))
-                else:
-                    out_py_file.write('        assert %s == %s' % (meta['generated_name'],
-                                                                   repr(meta['assertion']['value'])))
-            out_py_file.write(', str(%s)\n' % meta['generated_name'])
+        write_parse_assertion(meta, out_py_file)
 
     out_py_file.write('        location_end = stream.tell()\n')
     pretty_write(out_py_file, slot_items, leading_str='        return cls(', trailing_str=')')
@@ -651,9 +680,22 @@ def write_py_class(class_def: dict, out_py_file: TextIO, line_no: int):
             continue
         if meta['injected']:
             continue
+        if meta['generated_name'] in struct_group_starts:
+            group_index = struct_group_starts[meta['generated_name']]
+            pack_stmt = 'stream.write(self._FIELDS_STRUCT_%d.pack(' % group_index
+            pack_args = ['%s(self.%s)' % ('int' if x['type'] in STRUCT_INT_FIELD_TYPES else 'float',
+                                          x['generated_name']) for x in struct_groups[group_index]]
+            pretty_write(out_py_file, pack_args,
+                         leading_str='        ' + pack_stmt, trailing_str='))')
+            gen_pass_stub = False
+            continue
+        if 'struct_group' in meta:
+            continue
         if meta['is_array']:
             if meta['generated_type'] == 'bytes':
                 save_stmt = ['stream.write(self.%s)' % meta['generated_name']]
+            elif meta['type'] in BULK_ARRAY_TYPES:
+                save_stmt = ['%s.save_array(self.%s, stream)' % (meta['type'], meta['generated_name'])]
             else:
                 save_stmt = ['for t_%s in self.%s:' % (meta['generated_name'], meta['generated_name'])]
                 if meta['type'] in BUILTIN_TYPES:
@@ -667,13 +709,7 @@ def write_py_class(class_def: dict, out_py_file: TextIO, line_no: int):
                 save_stmt = ['self.%s.save(stream)' % meta['generated_name']]
         if meta['if_clause']:
             save_stmt = ['    %s' % x for x in save_stmt]
-            if_clause_token = camel_to_underline(meta['if_clause']).split(' ')
-            for i, token in enumerate(if_clause_token):
-                if token in KEYWORDS_IN_IF_CLAUSE:  # skip keywords
-                    continue
-                if TOKEN.match(token):
-                    if_clause_token[i] = 'self.%s' % token
-            save_stmt.insert(0, 'if %s:' % ' '.join(if_clause_token))
+            save_stmt.insert(0, 'if %s:' % meta['generated_self_if_clause'])
         for stmt in save_stmt:
             out_py_file.write('        %s\n' % stmt)
         gen_pass_stub = False
@@ -684,39 +720,48 @@ def write_py_class(class_def: dict, out_py_file: TextIO, line_no: int):
     # generate get_size method
     out_py_file.write('\n')
     out_py_file.write('    def get_size(self) -> int:\n')
-    out_py_file.write('        size = 0\n')
+    # the size of unconditional fixed-width scalar fields is summed up here as the initial value
+    fixed_size_names = set()
+    fixed_size = 0
+    for meta in class_attrs.values():
+        if meta['type'] in FIXED_SIZE_TYPES and not meta['is_array'] and not meta['if_clause'] and \
+                not meta['injected']:
+            fixed_size_names.add(meta['generated_name'])
+            fixed_size += FIXED_SIZE_TYPES[meta['type']]
+    out_py_file.write('        size = %d\n' % fixed_size)
     for meta in class_attrs.values():
         if meta['type'] == 'comment':
             continue
         if meta['injected']:
             continue
+        if meta['generated_name'] in fixed_size_names:
+            continue
         if meta['is_array']:
             if meta['generated_type'] == 'bytes':
                 size_stmt = ['size += len(self.%s)' % meta['generated_name']]
+            elif meta['type'] in FIXED_SIZE_TYPES:
+                size_stmt = ['size += len(self.%s) * %s._SIZE' % (meta['generated_name'], meta['type'])]
             else:
                 size_stmt = ['for t_%s in self.%s:' % (meta['generated_name'], meta['generated_name'])]
                 if meta['type'] in BUILTIN_TYPES:
-                    size_stmt.append('    size += len(%s(t_%s))' % (meta['type'], meta['generated_name']))
+                    size_stmt.append('    size += %s(t_%s).get_size()' % (meta['type'], meta['generated_name']))
                 else:
                     size_stmt.append('    size += len(t_%s)' % meta['generated_name'])
         else:
-            if meta['type'] in BUILTIN_TYPES:
-                size_stmt = ['size += len(%s(self.%s))' % (meta['type'], meta['generated_name'])]
+            if meta['type'] in FIXED_SIZE_TYPES:
+                size_stmt = ['size += %s._SIZE' % meta['type']]
+            elif meta['type'] in BUILTIN_TYPES:
+                # not len(): it is the character count for string, get_size is the serialized size
+                size_stmt = ['size += %s(self.%s).get_size()' % (meta['type'], meta['generated_name'])]
             else:
                 size_stmt = ['size += len(self.%s)' % meta['generated_name']]
         if meta['if_clause']:
             size_stmt = ['    %s' % x for x in size_stmt]
-            if_clause_token = camel_to_underline(meta['if_clause']).split(' ')
-            for i, token in enumerate(if_clause_token):
-                if token in KEYWORDS_IN_IF_CLAUSE:  # skip keywords
-                    continue
-                if TOKEN.match(token):
-                    if_clause_token[i] = 'self.%s' % token
-            size_stmt.insert(0, 'if %s:' % ' '.join(if_clause_token))
+            size_stmt.insert(0, 'if %s:' % meta['generated_self_if_clause'])
         for stmt in size_stmt:
             out_py_file.write('        %s\n' % stmt)
     out_py_file.write('        return size\n')
-    ending_comment = class_def['ending_comment'].getvalue()
+    ending_comment = ''.join(class_def['ending_comment'])
     if len(ending_comment) > 0:
         out_py_file.write('\n')
         out_py_file.write(ending_comment)
@@ -729,99 +774,158 @@ def write_py_class(class_def: dict, out_py_file: TextIO, line_no: int):
 _global_class_defs = {}
 _generated_template_classes = set()
 
-def parse_class_def(def_file: TextIO, out_py_file: TextIO, line_no: int):
-    rollback_position = def_file.tell()
-    line = def_file.readline()
-    match = TOKEN.match(line)
+def parse_class_def(def_file: Cursor, out_py_file: TextIO, line_no: int):
+    line = def_file.peek_line()
+    match = TOKEN.match(def_file.text, def_file.pos)
     assert match, 'line %d: %s' % (line_no, line)
     class_name = match.group()
-    rollback_position += len(class_name)
-    class_def = {'class_name': class_name, 'template_data': {}, 'tmp_comments': StringIO(), 'class_attrs': {}, 'ending_comment': StringIO()}
+    def_file.pos = match.end()
+    class_def = {'class_name': class_name, 'template_data': {}, 'tmp_comments': [], 'class_attrs': {}, 'ending_comment': []}
     _global_class_defs[class_name] = class_def
-    def_file.seek(rollback_position)
     line_no = parse_template_def(def_file, class_def['template_data'], line_no)
-    rollback_position = def_file.tell()
-    line_no = parse_new_line(def_file, class_def['tmp_comments'], line_no)
-    assert def_file.read(1) == '{', 'line %d: %s' % (line_no, line)
-    line_no = parse_new_line(def_file, class_def['tmp_comments'], line_no)
+    line_no = parse_new_line(def_file, class_def['tmp_comments'].append, line_no)
+    assert def_file.text.startswith('{', def_file.pos), 'line %d: %s' % (line_no, line)
+    def_file.pos += 1
+    line_no = parse_new_line(def_file, class_def['tmp_comments'].append, line_no)
     line_no = parse_class_body(def_file, class_def['class_attrs'], line_no)
-    assert def_file.read(1) == '}', 'line %d: %s' % (line_no, line)
+    assert def_file.text.startswith('}', def_file.pos), 'line %d: %s' % (line_no, line)
+    def_file.pos += 1
     try:
-        line_no = parse_new_line(def_file, class_def['ending_comment'], line_no)
+        line_no = parse_new_line(def_file, class_def['ending_comment'].append, line_no)
     except EOFError:
         pass
     write_py_class(class_def, out_py_file, line_no)
     return line_no
 
 
-def parse_new_line(def_file: TextIO, out_py_file: TextIO, line_no: int):
+def parse_new_line(def_file: Cursor, emit: Callable[[str], Any], line_no: int):
+    text = def_file.text
     while True:
-        rollback_position = def_file.tell()
-        line = def_file.readline()
         # skip empty line
-        if len(line) == 0:
+        pos = def_file.pos
+        if pos >= len(text):
             raise EOFError()
-        # skip space
-        match = SPACES.match(line)
-        if match:
-            line = line[match.end():]
-            rollback_position += match.end()
-        if len(line) == 0 or line == '\n':
+        # skip space, most lines start with a non-space character
+        if text[pos] in ' \t':
+            pos = def_file.skip_spaces()
+            if pos == len(text):
+                line_no += 1
+                continue
+        if text[pos] == '\n':
             line_no += 1
-            rollback_position += len(line)
+            def_file.pos += 1
             continue
-        def_file.seek(rollback_position)
-        if line.startswith('//'):
-            line_no = parse_comment(def_file, out_py_file, line_no)
+        if text.startswith('//', pos):
+            line_no = parse_comment(def_file, emit, line_no)
         else:
             return line_no
 
 
-def parse_def_document(def_file: TextIO, out_py_file: TextIO, line_no: int = 1):
+def parse_def_document(def_file: Cursor, out_py_file: TextIO, line_no: int = 1):
     while True:
-        line_no = parse_new_line(def_file, out_py_file, line_no)
+        line_no = parse_new_line(def_file, out_py_file.write, line_no)
         line_no = parse_class_def(def_file, out_py_file, line_no)
 
 
-def compute_sha256(file: str):
-    with open(file, 'rb') as f:
-        sha256 = hashlib.sha256()
-        while True:
-            data = f.read(1024 * 1024)
-            if not data:
-                break
-            sha256.update(data)
-        return sha256.hexdigest()
-
-
 # get the last non-empty line of a file
 def last_line_of_file(file: str):
-    with open(file, 'r') as f:
-        last_non_empty_line = ''
-        for line in f:
-            line = line.strip()
-            if len(line) == 0:
-                continue
-            last_non_empty_line = line
-        return last_non_empty_line
+    # read backwards from the end by growing blocks instead of iterating all lines
+    with open(file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        block_size = 4096
+        while True:
+            start = max(0, end - block_size)
+            f.seek(start)
+            lines = f.read(end - start).decode('utf8', 'replace').splitlines()
+            if start > 0:
+                # the first line may be cut in the middle
+                lines = lines[1:]
+            for line in reversed(lines):
+                line = line.strip()
+                if len(line) > 0:
+                    return line
+            if start == 0:
+                return ''
+            block_size *= 2
+
+
+# get the def file stamp (size and modification time) recorded in the header of a generated file
+def stamp_of_generated_file(file: str):
+    with open(file, 'r', encoding='utf8') as f:
+        f.readline()
+        line = f.readline().strip()
+    if line.startswith('# stamp: '):
+        return line[9:]
+    return None
+
+
+# replace the stamp in the header of an up-to-date generated file, so the next check takes the fast path again
+def refresh_stamp_of_generated_file(file: str, stamp: str):
+    with open(file, 'r', encoding='utf8') as f:
+        header = f.readline()
+        f.readline()  # the outdated stamp
+        body = f.read()
+    tmp_file = file + '.tmp'
+    try:
+        with open(tmp_file, 'w', encoding='utf8', buffering=1024 * 1024) as f:
+            f.write(header)
+            f.write('# stamp: %s\n' % stamp)
+            f.write(body)
+        os.replace(tmp_file, file)
+    finally:
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+
+
+# digest of the generator and runtime sources, the generated code depends on both of them, so it is recorded in the
+# stamp and the sha256 trailer to regenerate the parser when they change even if the def file is unchanged
+@lru_cache(maxsize=1)
+def generator_digest():
+    sha256 = hashlib.sha256()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in ('generator.py', 'common.py'):
+        with open(os.path.join(base_dir, name), 'rb') as f:
+            sha256.update(f.read())
+    return sha256.hexdigest()
 
 
 def generate_parser(def_file: str, out_py_file: str):
-    def_file_sha256 = compute_sha256(def_file)
+    # unchanged size and modification time: skip reading and hashing the def file
+    def_file_stat = os.stat(def_file)
+    def_file_stamp = '%d:%d:%s' % (def_file_stat.st_size, def_file_stat.st_mtime_ns, generator_digest())
+    if os.path.isfile(out_py_file) and stamp_of_generated_file(out_py_file) == def_file_stamp:
+        return
+    # read the def file once, both for the hash and for parsing
+    with open(def_file, 'rb') as f_def_fs:
+        def_file_content = f_def_fs.read()
+    def_file_sha256 = hashlib.sha256(def_file_content + generator_digest().encode('ascii')).hexdigest()
     if os.path.isfile(out_py_file):
         last_line = last_line_of_file(out_py_file)
         if last_line.startswith('# sha256: '):
             sha256 = last_line[10:]
             if sha256 == def_file_sha256:
+                # only the modification time changed (e.g. touched or checked out again)
+                refresh_stamp_of_generated_file(out_py_file, def_file_stamp)
                 return
-    with open(out_py_file, 'w', encoding='utf8') as f:
-        f.write('# Auto-generated file, do not edit\n\n')
-        f.write('from .common import *\nfrom typing import *\nfrom typing import BinaryIO\n\n')
-        with open(def_file, 'r', encoding='utf8') as f_def_fs:
-            with StringIO(f_def_fs.read()) as f_def:
-                try:
-                    parse_def_document(f_def, f)
-                except EOFError:
-                    pass
-                f.write('\n# generated at: %s\n' % datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-                f.write('# sha256: %s\n' % def_file_sha256)
+    # generate into a temporary file and move it into place when complete, so an interrupted generation never leaves
+    # a truncated parser behind whose stamp matches
+    tmp_py_file = out_py_file + '.tmp'
+    try:
+        # large buffer: the generated file is flushed in a few writes instead of one per 8 KiB
+        with open(tmp_py_file, 'w', encoding='utf8', buffering=1024 * 1024) as f:
+            f.write('# Auto-generated file, do not edit\n')
+            f.write('# stamp: %s\n\n' % def_file_stamp)
+            f.write('from .common import *\nfrom typing import *\nfrom typing import BinaryIO\n\n')
+            # same newline translation as reading in text mode
+            f_def = Cursor(def_file_content.decode('utf8').replace('\r\n', '\n').replace('\r', '\n'))
+            try:
+                parse_def_document(f_def, f)
+            except EOFError:
+                pass
+            f.write('\n# generated at: %s\n' % datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            f.write('# sha256: %s\n' % def_file_sha256)
+        os.replace(tmp_py_file, out_py_file)
+    finally:
+        if os.path.isfile(tmp_py_file):
+            os.remove(tmp_py_file)